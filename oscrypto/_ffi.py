@@ -21,6 +21,7 @@ __all__ = [
     'buffer_from_bytes',
     'buffer_from_unicode',
     'buffer_pointer',
+    'buffer_view',
     'byte_array',
     'byte_string_from_buffer',
     'bytes_from_buffer',
@@ -75,6 +76,9 @@ if ffi() == 'cffi':
     def buffer_pointer(buffer):
         return ffi.new('char *[]', [buffer])
 
+    def buffer_view(point, size):
+        return memoryview(ffi.buffer(point, size))
+
     def cast(library, type_, value):
         ffi_obj = _get_ffi(library)
         return ffi_obj.cast(type_, value)
@@ -283,6 +287,9 @@ else:
     def buffer_pointer(buffer):
         return pointer(ctypes.cast(buffer, c_char_p))
 
+    def buffer_view(point, size):
+        return memoryview((ctypes.c_char * size).from_address(ctypes.addressof(point.contents)))
+
     def cast(library, type_, value):
         is_pointer, is_array, type_ = _type_info(library, type_)
 
@@ -6,22 +6,24 @@ import sys
 import re
 import socket as socket_
 import select
+import struct as struct_
 import numbers
 import errno
+import itertools
 import weakref
 
 from ._security import Security, osx_version_info, handle_sec_error, SecurityConst
 from ._core_foundation import CoreFoundation, handle_cf_error, CFHelpers
 from .._asn1 import (
     Certificate as Asn1Certificate,
-    int_to_bytes,
+    int_from_bytes,
     timezone,
 )
 from .._errors import pretty_message
 from .._ffi import (
-    array_from_pointer,
     array_set,
     buffer_from_bytes,
+    buffer_view,
     bytes_from_buffer,
     callback,
     cast,
@@ -29,6 +31,7 @@ from .._ffi import (
     new,
     null,
     pointer_set,
+    ref,
     struct,
     struct_bytes,
     unwrap,
@@ -69,6 +72,10 @@ if sys.version_info < (3, 7):
 else:
     Pattern = re.Pattern
 
+# memoryview was added in Python 2.7 - on Python 2.6 the read callback has to
+# recv() byte strings and copy them into the Secure Transport buffer
+_HAS_MEMORYVIEW = sys.version_info >= (2, 7)
+
 
 __all__ = [
     'TLSSession',
@@ -92,10 +99,72 @@ _PROTOCOL_CONST_STRING_MAP = {
     SecurityConst.kTLSProtocol12: 'TLSv1.2',
 }
 
+_DEFAULT_PROTOCOLS = frozenset(['TLSv1', 'TLSv1.1', 'TLSv1.2'])
+_ALLOWED_PROTOCOLS = frozenset(['SSLv3', 'TLSv1', 'TLSv1.1', 'TLSv1.2'])
+
+# Alert and handshake record types, and SSL 3.0 through TLS 1.3 versions
+_VALID_RECORD_TYPES = frozenset([b'\x15', b'\x16'])
+_VALID_RECORD_VERSIONS = frozenset([
+    b'\x03\x00',
+    b'\x03\x01',
+    b'\x03\x02',
+    b'\x03\x03',
+    b'\x03\x04'
+])
+
+_VALID_TRUST_RESULT_CODES = frozenset([
+    SecurityConst.kSecTrustResultProceed,
+    SecurityConst.kSecTrustResultUnspecified
+])
+
+_HANDSHAKE_ERROR_CODES = frozenset([
+    SecurityConst.errSSLXCertChainInvalid,
+    SecurityConst.errSSLCertExpired,
+    SecurityConst.errSSLCertNotYetValid,
+    SecurityConst.errSSLUnknownRootCert,
+    SecurityConst.errSSLNoRootCert,
+    SecurityConst.errSSLHostNameMismatch,
+    SecurityConst.errSSLInternal,
+])
+
+_PROTOCOL_ERROR_CODES = frozenset([SecurityConst.errSSLRecordOverflow, SecurityConst.errSSLProtocol])
+_CLOSED_ERROR_CODES = frozenset([SecurityConst.errSSLClosedNoNotify, SecurityConst.errSSLClosedAbort])
+_READ_NON_ERROR_CODES = frozenset([SecurityConst.errSSLWouldBlock, SecurityConst.errSSLClosedGraceful])
+
+_WEAK_HASH_ALGOS = frozenset(['md5', 'md2'])
+
+# Maps the CSSM result code behind a failed certificate validation to the
+# function that raises the matching exception
+_CSSM_ERROR_HANDLERS = {
+    SecurityConst.CSSMERR_TP_CERT_REVOKED: raise_revoked,
+    SecurityConst.CSSMERR_APPLETP_HOSTNAME_MISMATCH: raise_hostname,
+    SecurityConst.CSSMERR_TP_CERT_EXPIRED: raise_expired_not_yet_valid,
+    SecurityConst.CSSMERR_TP_CERT_NOT_VALID_YET: raise_expired_not_yet_valid,
+    SecurityConst.CSSMERR_TP_NOT_TRUSTED: raise_no_issuer,
+}
+
+# The most data TLSSocket.read() asks SSLRead() for in one call. This spans
+# several TLS records, so bulk reads need fewer trips through SSLRead().
+_READ_CHUNK_SIZE = 65536
+
+# The amount read_until() requests when Secure Transport has nothing buffered.
+# Kept small so reading a few short lines does not grow the read buffer.
+_READ_UNTIL_SIZE = 8192
+
 _line_regex = re.compile(b'(\r\n|\r|\n)')
 _cipher_blacklist_regex = re.compile('anon|PSK|SEED|RC4|MD5|NULL|CAMELLIA|ARIA|SRP|KRB5|EXPORT|(?<!3)DES|IDEA')
-_connection_refs = weakref.WeakValueDictionary()
-_socket_refs = {}
+# The blacklist is applied once at import so handshakes only need a set lookup
+_BLOCKED_CIPHER_INTS = frozenset([
+    int_from_bytes(cipher_suite)
+    for cipher_suite, cipher_suite_name in CIPHER_SUITE_MAP.items()
+    if _cipher_blacklist_regex.search(cipher_suite_name) is not None
+])
+# Maps a connection id to a 2-element tuple of a weakref to the TLSSocket and
+# the underlying socket, so the I/O callbacks only need a single lookup
+_connection_refs = {}
+# Connection ids are handed to Secure Transport as an SSLConnectionRef, so
+# they are kept within 31 bits and never 0, which would be a NULL pointer
+_connection_id_counter = itertools.count()
 
 
 def _read_callback(connection_id, data_buffer, data_length_pointer):
@@ -118,36 +187,48 @@ def _read_callback(connection_id, data_buffer, data_length_pointer):
 
     self = None
     try:
-        self = _connection_refs.get(connection_id)
-        if not self:
-            socket = _socket_refs.get(connection_id)
-        else:
-            socket = self._socket
-
-        if not self and not socket:
+        connection_ref = _connection_refs.get(connection_id)
+        if connection_ref is None:
             return 0
+        self_ref, socket = connection_ref
+        self = self_ref()
 
         bytes_requested = deref(data_length_pointer)
 
         timeout = socket.gettimeout()
+        # For blocking sockets let the kernel fill the whole request in a
+        # single call instead of looping over partial reads in Python
+        recv_flags = socket_.MSG_WAITALL if timeout is None else 0
         error = None
-        data = b''
+        # Receive straight into the buffer Secure Transport provided, so the
+        # data is not copied through an intermediate byte string
+        if _HAS_MEMORYVIEW:
+            read_view = buffer_view(data_buffer, bytes_requested)
+        else:
+            read_view = None
+            chunks = []
+        bytes_read = 0
         try:
-            while len(data) < bytes_requested:
+            while bytes_read < bytes_requested:
                 # Python 2 on Travis CI seems to have issues with blocking on
                 # recv() for longer than the socket timeout value, so we select
                 if timeout is not None and timeout > 0.0:
                     read_ready, _, _ = select.select([socket], [], [], timeout)
                     if len(read_ready) == 0:
                         raise socket_.error(errno.EAGAIN, 'timed out')
-                chunk = socket.recv(bytes_requested - len(data))
-                data += chunk
-                if chunk == b'':
-                    if len(data) == 0:
+                if read_view is not None:
+                    chunk_length = socket.recv_into(read_view[bytes_read:], bytes_requested - bytes_read, recv_flags)
+                else:
+                    chunk = socket.recv(bytes_requested - bytes_read, recv_flags)
+                    chunks.append(chunk)
+                    chunk_length = len(chunk)
+                if chunk_length == 0:
+                    if bytes_read == 0:
                         if timeout is None:
                             return SecurityConst.errSSLClosedNoNotify
                         return SecurityConst.errSSLClosedAbort
                     break
+                bytes_read += chunk_length
         except (socket_.error) as e:
             error = e.errno
 
@@ -156,30 +237,30 @@ def _read_callback(connection_id, data_buffer, data_length_pointer):
                 return SecurityConst.errSSLClosedNoNotify
             return SecurityConst.errSSLClosedAbort
 
+        if read_view is None:
+            data = b''.join(chunks)
+            write_to_buffer(data_buffer, data)
+        elif self and not self._done_handshake:
+            data = read_view[0:bytes_read].tobytes()
+
         if self and not self._done_handshake:
             # SecureTransport doesn't bother to check if the TLS record header
             # is valid before asking to read more data, which can result in
             # connection hangs. Here we do basic checks to get around the issue.
             if len(data) >= 3 and len(self._server_hello) == 0:
                 # Check to ensure it is an alert or handshake first
-                valid_record_type = data[0:1] in set([b'\x15', b'\x16'])
+                valid_record_type = data[0:1] in _VALID_RECORD_TYPES
                 # Check if the protocol version is SSL 3.0 or TLS 1.0-1.3
-                valid_protocol_version = data[1:3] in set([
-                    b'\x03\x00',
-                    b'\x03\x01',
-                    b'\x03\x02',
-                    b'\x03\x03',
-                    b'\x03\x04'
-                ])
+                valid_protocol_version = data[1:3] in _VALID_RECORD_VERSIONS
                 if not valid_record_type or not valid_protocol_version:
-                    self._server_hello += data + _read_remaining(socket)
+                    self._server_hello.extend(data)
+                    self._server_hello.extend(_read_remaining(socket))
                     return SecurityConst.errSSLProtocol
-            self._server_hello += data
+            self._server_hello.extend(data)
 
-        write_to_buffer(data_buffer, data)
-        pointer_set(data_length_pointer, len(data))
+        pointer_set(data_length_pointer, bytes_read)
 
-        if len(data) != bytes_requested:
+        if bytes_read != bytes_requested:
             return SecurityConst.errSSLWouldBlock
 
         return 0
@@ -232,24 +313,28 @@ def _write_callback(connection_id, data_buffer, data_length_pointer):
     """
 
     try:
-        self = _connection_refs.get(connection_id)
-        if not self:
-            socket = _socket_refs.get(connection_id)
-        else:
-            socket = self._socket
-
-        if not self and not socket:
+        connection_ref = _connection_refs.get(connection_id)
+        if connection_ref is None:
             return 0
+        self_ref, socket = connection_ref
+        self = self_ref()
 
         data_length = deref(data_length_pointer)
         data = bytes_from_buffer(data_buffer, data_length)
 
         if self and not self._done_handshake:
-            self._client_hello += data
+            self._client_hello.extend(data)
 
         error = None
         try:
-            sent = socket.send(data)
+            # A blocking socket can always take the rest of the data, so write
+            # all of it here instead of returning errSSLWouldBlock and having
+            # Secure Transport call back in for each partial write
+            if socket.gettimeout() is None:
+                socket.sendall(data)
+                sent = data_length
+            else:
+                sent = socket.send(data)
         except (socket_.error) as e:
             error = e.errno
 
@@ -284,6 +369,12 @@ class TLSSession(object):
     _extra_trust_roots = None
     _peer_id = None
 
+    # Secure Transport protocol settings derived from _protocols, computed once
+    # here rather than for every TLSSocket that uses the session
+    _legacy_protocol_flags = None
+    _min_protocol_const = None
+    _max_protocol_const = None
+
     def __init__(self, protocol=None, manual_validation=False, extra_trust_roots=None):
         """
         :param protocol:
@@ -326,7 +417,7 @@ class TLSSession(object):
         self._manual_validation = manual_validation
 
         if protocol is None:
-            protocol = set(['TLSv1', 'TLSv1.1', 'TLSv1.2'])
+            protocol = set(_DEFAULT_PROTOCOLS)
 
         if isinstance(protocol, str_cls):
             protocol = set([protocol])
@@ -339,7 +430,7 @@ class TLSSession(object):
                 type_name(protocol)
             ))
 
-        unsupported_protocols = protocol - set(['SSLv3', 'TLSv1', 'TLSv1.1', 'TLSv1.2'])
+        unsupported_protocols = protocol - _ALLOWED_PROTOCOLS
         if unsupported_protocols:
             raise ValueError(pretty_message(
                 '''
@@ -351,6 +442,16 @@ class TLSSession(object):
 
         self._protocols = protocol
 
+        if osx_version_info < (10, 8):
+            self._legacy_protocol_flags = [
+                (_PROTOCOL_STRING_CONST_MAP[legacy_protocol], legacy_protocol in protocol)
+                for legacy_protocol in ['SSLv2', 'SSLv3', 'TLSv1']
+            ]
+        else:
+            protocol_consts = [_PROTOCOL_STRING_CONST_MAP[p] for p in protocol]
+            self._min_protocol_const = min(protocol_consts)
+            self._max_protocol_const = max(protocol_consts)
+
         self._extra_trust_roots = []
         if extra_trust_roots:
             for extra_trust_root in extra_trust_roots:
@@ -372,7 +473,18 @@ class TLSSession(object):
                     ))
                 self._extra_trust_roots.append(extra_trust_root)
 
-        self._peer_id = rand_bytes(8)
+    def _get_peer_id(self):
+        """
+        Returns the random peer id that allows Secure Transport to reuse this
+        session, generating it the first time a socket needs it
+
+        :return:
+            An 8-byte byte string
+        """
+
+        if self._peer_id is None:
+            self._peer_id = rand_bytes(8)
+        return self._peer_id
 
 
 class TLSSocket(object):
@@ -388,10 +500,20 @@ class TLSSocket(object):
 
     _decrypted_bytes = None
 
+    # Scratch memory reused by every call to read(), write() and
+    # _os_buffered_size() - owned by the socket and never returned to the caller
+    _read_buffer = None
+    _read_buffer_size = 0
+    _read_processed_pointer = None
+    _write_processed_pointer = None
+    _buffered_size_pointer = None
+
     _hostname = None
 
     _certificate = None
     _intermediates = None
+    # DER-encoded intermediates, parsed on first access of .intermediates
+    _intermediates_der = None
 
     _protocol = None
     _cipher_suite = None
@@ -408,6 +530,10 @@ class TLSSocket(object):
 
     _connection_id = None
 
+    # A 1-element tuple of the underlying socket, set up once for the
+    # select() calls in select_read() and select_write()
+    _select_sockets = None
+
     @classmethod
     def wrap(cls, socket, hostname, session=None):
         """
@@ -477,10 +603,14 @@ class TLSSocket(object):
         """
 
         self._done_handshake = False
-        self._server_hello = b''
-        self._client_hello = b''
+        self._server_hello = bytearray()
+        self._client_hello = bytearray()
 
-        self._decrypted_bytes = b''
+        self._decrypted_bytes = bytearray()
+
+        self._read_processed_pointer = new(Security, 'size_t *')
+        self._write_processed_pointer = new(Security, 'size_t *')
+        self._buffered_size_pointer = new(Security, 'size_t *')
 
         if address is None and port is None:
             self._socket = None
@@ -565,9 +695,9 @@ class TLSSocket(object):
             )
             handle_sec_error(result)
 
-            self._connection_id = id(self) % 2147483647
-            _connection_refs[self._connection_id] = self
-            _socket_refs[self._connection_id] = self._socket
+            self._connection_id = next(_connection_id_counter) % 0x7fffffff + 1
+            _connection_refs[self._connection_id] = (weakref.ref(self), self._socket)
+            self._select_sockets = (self._socket,)
             result = Security.SSLSetConnection(session_context, self._connection_id)
             handle_sec_error(result)
 
@@ -588,9 +718,7 @@ class TLSSocket(object):
 
             # Ensure requested protocol support is set for the session
             if osx_version_info < (10, 8):
-                for protocol in ['SSLv2', 'SSLv3', 'TLSv1']:
-                    protocol_const = _PROTOCOL_STRING_CONST_MAP[protocol]
-                    enabled = protocol in self._session._protocols
+                for protocol_const, enabled in self._session._legacy_protocol_flags:
                     result = Security.SSLSetProtocolVersionEnabled(
                         session_context,
                         protocol_const,
@@ -603,17 +731,14 @@ class TLSSocket(object):
                     handle_sec_error(result)
 
             else:
-                protocol_consts = [_PROTOCOL_STRING_CONST_MAP[protocol] for protocol in self._session._protocols]
-                min_protocol = min(protocol_consts)
-                max_protocol = max(protocol_consts)
                 result = Security.SSLSetProtocolVersionMin(
                     session_context,
-                    min_protocol
+                    self._session._min_protocol_const
                 )
                 handle_sec_error(result)
                 result = Security.SSLSetProtocolVersionMax(
                     session_context,
-                    max_protocol
+                    self._session._max_protocol_const
                 )
                 handle_sec_error(result)
 
@@ -642,19 +767,17 @@ class TLSSocket(object):
             handle_sec_error(result)
 
             supported_ciphers = deref(supported_ciphers_pointer)
-            supported_cipher_suites = array_from_pointer(
-                Security,
-                'uint32_t',
-                supported_cipher_suites_pointer,
-                supported_ciphers
+            # Unpacking the raw buffer in one call avoids boxing each uint32_t
+            # through the FFI individually
+            supported_cipher_suites = struct_.unpack(
+                b'=' + b'I' * supported_ciphers,
+                bytes_from_buffer(cipher_buffer, supported_ciphers * 4)
             )
-            good_ciphers = []
-            for supported_cipher_suite in supported_cipher_suites:
-                cipher_suite = int_to_bytes(supported_cipher_suite, width=2)
-                cipher_suite_name = CIPHER_SUITE_MAP.get(cipher_suite, cipher_suite)
-                good_cipher = _cipher_blacklist_regex.search(cipher_suite_name) is None
-                if good_cipher:
-                    good_ciphers.append(supported_cipher_suite)
+            good_ciphers = [
+                supported_cipher_suite
+                for supported_cipher_suite in supported_cipher_suites
+                if supported_cipher_suite not in _BLOCKED_CIPHER_INTS
+            ]
 
             num_good_ciphers = len(good_ciphers)
             good_ciphers_array = new(Security, 'uint32_t[]', num_good_ciphers)
@@ -670,7 +793,7 @@ class TLSSocket(object):
             # Set a peer id from the session to allow for session reuse, the hostname
             # is appended to prevent a bug on OS X 10.7 where it tries to reuse a
             # connection even if the hostnames are different.
-            peer_id = self._session._peer_id + self._hostname.encode('utf-8')
+            peer_id = self._session._get_peer_id() + self._hostname.encode('utf-8')
             result = Security.SSLSetPeerID(session_context, peer_id, len(peer_id))
             handle_sec_error(result)
 
@@ -811,11 +934,7 @@ class TLSSocket(object):
                 handle_sec_error(result)
 
                 trust_result_code = deref(result_pointer)
-                invalid_chain_error_codes = set([
-                    SecurityConst.kSecTrustResultProceed,
-                    SecurityConst.kSecTrustResultUnspecified
-                ])
-                if trust_result_code not in invalid_chain_error_codes:
+                if trust_result_code not in _VALID_TRUST_RESULT_CODES:
                     handshake_result = SecurityConst.errSSLXCertChainInvalid
                 else:
                     handshake_result = Security.SSLHandshake(session_context)
@@ -824,22 +943,12 @@ class TLSSocket(object):
 
             self._done_handshake = True
 
-            handshake_error_codes = set([
-                SecurityConst.errSSLXCertChainInvalid,
-                SecurityConst.errSSLCertExpired,
-                SecurityConst.errSSLCertNotYetValid,
-                SecurityConst.errSSLUnknownRootCert,
-                SecurityConst.errSSLNoRootCert,
-                SecurityConst.errSSLHostNameMismatch,
-                SecurityConst.errSSLInternal,
-            ])
-
             # In testing, only errSSLXCertChainInvalid was ever returned for
             # all of these different situations, however we include the others
             # for completeness. To get the real reason we have to use the
             # certificate from the handshake and use the deprecated function
             # SecTrustGetCssmResultCode().
-            if handshake_result in handshake_error_codes:
+            if handshake_result in _HANDSHAKE_ERROR_CODES:
                 if trust_ref:
                     CoreFoundation.CFRelease(trust_ref)
                     trust_ref = None
@@ -856,60 +965,49 @@ class TLSSocket(object):
                 result = Security.SecTrustGetCssmResultCode(trust_ref, result_code_pointer)
                 result_code = deref(result_code_pointer)
 
-                chain = extract_chain(self._server_hello)
+                chain = extract_chain(bytes(self._server_hello))
 
-                self_signed = False
-                revoked = False
-                expired = False
-                not_yet_valid = False
-                no_issuer = False
                 cert = None
-                bad_hostname = False
+                handler = None
 
                 if chain:
                     cert = chain[0]
                     oscrypto_cert = load_certificate(cert)
                     self_signed = oscrypto_cert.self_signed
-                    revoked = result_code == SecurityConst.CSSMERR_TP_CERT_REVOKED
-                    no_issuer = not self_signed and result_code == SecurityConst.CSSMERR_TP_NOT_TRUSTED
-                    expired = result_code == SecurityConst.CSSMERR_TP_CERT_EXPIRED
-                    not_yet_valid = result_code == SecurityConst.CSSMERR_TP_CERT_NOT_VALID_YET
-                    bad_hostname = result_code == SecurityConst.CSSMERR_APPLETP_HOSTNAME_MISMATCH
+                    handler = _CSSM_ERROR_HANDLERS.get(result_code)
 
                     # On macOS 10.12, some expired certificates return errSSLInternal
-                    if osx_version_info >= (10, 12):
+                    if osx_version_info >= (10, 12) and handler is not raise_revoked and handler is not raise_hostname:
                         validity = cert['tbs_certificate']['validity']
                         not_before = validity['not_before'].chosen.native
                         not_after = validity['not_after'].chosen.native
                         utcnow = datetime.datetime.now(timezone.utc)
-                        expired = not_after < utcnow
-                        not_yet_valid = not_before > utcnow
+                        if not_after < utcnow or not_before > utcnow:
+                            handler = raise_expired_not_yet_valid
+                        elif handler is raise_expired_not_yet_valid:
+                            handler = None
 
-                if chain and chain[0].hash_algo in set(['md5', 'md2']):
-                    raise_weak_signature(chain[0])
+                    # A self-signed certificate is never reported as missing
+                    # an issuer, and is the fallback for unmapped result codes
+                    if self_signed and (handler is None or handler is raise_no_issuer):
+                        handler = raise_self_signed
 
-                if revoked:
-                    raise_revoked(cert)
+                if chain and chain[0].hash_algo in _WEAK_HASH_ALGOS:
+                    raise_weak_signature(chain[0])
 
-                if bad_hostname:
+                if handler is raise_hostname:
                     raise_hostname(cert, self._hostname)
 
-                elif expired or not_yet_valid:
-                    raise_expired_not_yet_valid(cert)
-
-                elif no_issuer:
-                    raise_no_issuer(cert)
+                elif handler is not None:
+                    handler(cert)
 
-                elif self_signed:
-                    raise_self_signed(cert)
-
-                if detect_client_auth_request(self._server_hello):
+                if detect_client_auth_request(bytes(self._server_hello)):
                     raise_client_auth()
 
                 raise_verification(cert)
 
             if handshake_result == SecurityConst.errSSLPeerHandshakeFail:
-                if detect_client_auth_request(self._server_hello):
+                if detect_client_auth_request(bytes(self._server_hello)):
                     raise_client_auth()
                 raise_handshake()
 
@@ -919,19 +1017,19 @@ class TLSSocket(object):
             if handshake_result == SecurityConst.errSSLPeerProtocolVersion:
                 raise_protocol_version()
 
-            if handshake_result in set([SecurityConst.errSSLRecordOverflow, SecurityConst.errSSLProtocol]):
-                self._server_hello += _read_remaining(self._socket)
-                raise_protocol_error(self._server_hello)
+            if handshake_result in _PROTOCOL_ERROR_CODES:
+                self._server_hello.extend(_read_remaining(self._socket))
+                raise_protocol_error(bytes(self._server_hello))
 
-            if handshake_result in set([SecurityConst.errSSLClosedNoNotify, SecurityConst.errSSLClosedAbort]):
+            if handshake_result in _CLOSED_ERROR_CODES:
                 if not self._done_handshake:
-                    self._server_hello += _read_remaining(self._socket)
-                if detect_other_protocol(self._server_hello):
-                    raise_protocol_error(self._server_hello)
+                    self._server_hello.extend(_read_remaining(self._socket))
+                if detect_other_protocol(bytes(self._server_hello)):
+                    raise_protocol_error(bytes(self._server_hello))
                 raise_disconnection()
 
             if osx_version_info < (10, 10):
-                dh_params_length = get_dh_params_length(self._server_hello)
+                dh_params_length = get_dh_params_length(bytes(self._server_hello))
                 if dh_params_length is not None and dh_params_length < 1024:
                     raise_dh_params()
 
@@ -961,12 +1059,12 @@ class TLSSocket(object):
             handle_sec_error(result)
             cipher_int = deref(cipher_int_pointer)
 
-            cipher_bytes = int_to_bytes(cipher_int, width=2)
+            cipher_bytes = struct_.pack(b'>H', cipher_int)
             self._cipher_suite = CIPHER_SUITE_MAP.get(cipher_bytes, cipher_bytes)
 
             session_info = parse_session_info(
-                self._server_hello,
-                self._client_hello
+                bytes(self._server_hello),
+                bytes(self._client_hello)
             )
             self._compression = session_info['compression']
             self._session_id = session_info['session_id']
@@ -1045,9 +1143,9 @@ class TLSSocket(object):
         if self._session_context is None:
             # Even if the session is closed, we can use
             # buffered data to respond to read requests
-            if self._decrypted_bytes != b'':
-                output = self._decrypted_bytes
-                self._decrypted_bytes = b''
+            if len(self._decrypted_bytes) > 0:
+                output = bytes(self._decrypted_bytes)
+                self._decrypted_bytes = bytearray()
                 return output
 
             self._raise_closed()
@@ -1056,23 +1154,27 @@ class TLSSocket(object):
 
         # If we already have enough buffered data, just use that
         if buffered_length >= max_length:
-            output = self._decrypted_bytes[0:max_length]
-            self._decrypted_bytes = self._decrypted_bytes[max_length:]
+            output = bytes(self._decrypted_bytes[0:max_length])
+            del self._decrypted_bytes[0:max_length]
             return output
 
         # Don't block if we have buffered data available, since it is ok to
         # return less than the max_length
         if buffered_length > 0 and not self.select_read(0):
-            output = self._decrypted_bytes
-            self._decrypted_bytes = b''
+            output = bytes(self._decrypted_bytes)
+            self._decrypted_bytes = bytearray()
             return output
 
         # Only read enough to get the requested amount when
         # combined with buffered data
-        to_read = max_length - len(self._decrypted_bytes)
+        to_read = min(max_length - buffered_length, _READ_CHUNK_SIZE)
+
+        if self._read_buffer_size < to_read:
+            self._read_buffer = buffer_from_bytes(to_read)
+            self._read_buffer_size = to_read
 
-        read_buffer = buffer_from_bytes(to_read)
-        processed_pointer = new(Security, 'size_t *')
+        read_buffer = self._read_buffer
+        processed_pointer = self._read_processed_pointer
         result = Security.SSLRead(
             self._session_context,
             read_buffer,
@@ -1083,7 +1185,7 @@ class TLSSocket(object):
             exception = self._exception
             self._exception = None
             raise exception
-        if result and result not in set([SecurityConst.errSSLWouldBlock, SecurityConst.errSSLClosedGraceful]):
+        if result and result not in _READ_NON_ERROR_CODES:
             handle_sec_error(result, TLSError)
 
         if result and result == SecurityConst.errSSLClosedGraceful:
@@ -1092,10 +1194,16 @@ class TLSSocket(object):
             self._raise_closed()
 
         bytes_read = deref(processed_pointer)
-        output = self._decrypted_bytes + bytes_from_buffer(read_buffer, bytes_read)
+        output = bytes_from_buffer(read_buffer, bytes_read)
 
-        self._decrypted_bytes = output[max_length:]
-        return output[0:max_length]
+        # Since no more than to_read bytes were requested, the buffered data
+        # and the new data together never exceed max_length
+        if buffered_length > 0:
+            self._decrypted_bytes.extend(output)
+            output = bytes(self._decrypted_bytes)
+            self._decrypted_bytes = bytearray()
+
+        return output
 
     def select_read(self, timeout=None):
         """
@@ -1114,7 +1222,7 @@ class TLSSocket(object):
         if len(self._decrypted_bytes) > 0:
             return True
 
-        read_ready, _, _ = select.select([self._socket], [], [], timeout)
+        read_ready, _, _ = select.select(self._select_sockets, (), (), timeout)
         return len(read_ready) > 0
 
     def read_until(self, marker):
@@ -1132,7 +1240,9 @@ class TLSSocket(object):
             A byte string of the data read, including the marker
         """
 
-        if not isinstance(marker, byte_cls) and not isinstance(marker, Pattern):
+        is_regex = not isinstance(marker, byte_cls)
+
+        if is_regex and not isinstance(marker, Pattern):
             raise TypeError(pretty_message(
                 '''
                 marker must be a byte string or compiled regex object, not %s
@@ -1140,23 +1250,25 @@ class TLSSocket(object):
                 type_name(marker)
             ))
 
-        output = b''
-
-        is_regex = isinstance(marker, Pattern)
+        output = bytearray()
 
         while True:
             if len(self._decrypted_bytes) > 0:
                 chunk = self._decrypted_bytes
-                self._decrypted_bytes = b''
+                self._decrypted_bytes = bytearray()
             else:
-                to_read = self._os_buffered_size() or 8192
+                to_read = self._os_buffered_size() or _READ_UNTIL_SIZE
                 chunk = self.read(to_read)
 
             offset = len(output)
-            output += chunk
+            output.extend(chunk)
 
             if is_regex:
-                match = marker.search(output)
+                # Since any line ending in the earlier data would already have
+                # matched, line searches only need to scan the new chunk. Other
+                # patterns may match across old and new data, so rescan it all.
+                start = offset if marker is _line_regex else 0
+                match = marker.search(output, start)
                 if match is not None:
                     end = match.end()
                     break
@@ -1164,14 +1276,18 @@ class TLSSocket(object):
                 # If the marker was not found last time, we have to start
                 # at a position where the marker would have its final char
                 # in the newly read chunk
-                start = max(0, offset - len(marker) - 1)
+                start = max(0, offset - len(marker) + 1)
                 match = output.find(marker, start)
                 if match != -1:
                     end = match + len(marker)
                     break
 
-        self._decrypted_bytes = output[end:] + self._decrypted_bytes
-        return output[0:end]
+        # Every chunk is taken out of self._decrypted_bytes or returned by
+        # read(), so the buffer is empty here and the leftover data can
+        # replace it outright instead of being copied to its front
+        self._decrypted_bytes = output[end:]
+        del output[end:]
+        return bytes(output)
 
     def _os_buffered_size(self):
         """
@@ -1183,7 +1299,7 @@ class TLSSocket(object):
             An integer - the number of available bytes
         """
 
-        num_bytes_pointer = new(Security, 'size_t *')
+        num_bytes_pointer = self._buffered_size_pointer
         result = Security.SSLGetBufferedReadSize(
             self._session_context,
             num_bytes_pointer
@@ -1214,13 +1330,16 @@ class TLSSocket(object):
             A byte string of the data that was read
         """
 
-        output = b''
-        remaining = num_bytes
-        while remaining > 0:
-            output += self.read(remaining)
-            remaining = num_bytes - len(output)
+        # Copy each chunk into its final position instead of concatenating
+        output = bytearray(num_bytes)
+        bytes_read = 0
+        while bytes_read < num_bytes:
+            chunk = self.read(num_bytes - bytes_read)
+            chunk_length = len(chunk)
+            output[bytes_read:bytes_read + chunk_length] = chunk
+            bytes_read += chunk_length
 
-        return output
+        return bytes(output)
 
     def write(self, data):
         """
@@ -1242,28 +1361,42 @@ class TLSSocket(object):
         if self._session_context is None:
             self._raise_closed()
 
-        processed_pointer = new(Security, 'size_t *')
-
         data_len = len(data)
-        while data_len:
-            write_buffer = buffer_from_bytes(data)
+        if data_len == 0:
+            return
+
+        processed_pointer = self._write_processed_pointer
+
+        # The data is copied into an FFI buffer once, and partial writes
+        # advance a pointer into it instead of re-slicing the remaining data
+        write_buffer = buffer_from_bytes(data)
+        offset = 0
+        while offset < data_len:
+            if offset == 0:
+                write_pointer = write_buffer
+            else:
+                write_pointer = cast(Security, 'char *', ref(write_buffer, offset))
             result = Security.SSLWrite(
                 self._session_context,
-                write_buffer,
-                data_len,
+                write_pointer,
+                data_len - offset,
                 processed_pointer
             )
             if self._exception is not None:
                 exception = self._exception
                 self._exception = None
                 raise exception
-            handle_sec_error(result, TLSError)
 
             bytes_written = deref(processed_pointer)
-            data = data[bytes_written:]
-            data_len = len(data)
-            if data_len > 0:
-                self.select_write()
+            if result == SecurityConst.errSSLWouldBlock:
+                # Only wait on the socket when Secure Transport could not
+                # accept any data, otherwise try to push the rest right away
+                if bytes_written == 0:
+                    self.select_write()
+            else:
+                handle_sec_error(result, TLSError)
+
+            offset += bytes_written
 
     def select_write(self, timeout=None):
         """
@@ -1278,7 +1411,7 @@ class TLSSocket(object):
             if timeout is not None.
         """
 
-        _, write_ready, _ = select.select([], [self._socket], [], timeout)
+        _, write_ready, _ = select.select((), self._select_sockets, (), timeout)
         return len(write_ready) > 0
 
     def _shutdown(self, manual):
@@ -1292,8 +1425,12 @@ class TLSSocket(object):
         if self._session_context is None:
             return
 
-        # Ignore error during close in case other end closed already
-        result = Security.SSLClose(self._session_context)
+        # Once the other end has sent its close_notify there is no session
+        # left to close, so skip writing our own alert to a closed socket.
+        # Otherwise ignore errors during close in case the other end closed
+        # without notifying us.
+        if not self._gracefully_closed:
+            result = Security.SSLClose(self._session_context)
 
         if osx_version_info < (10, 8):
             result = Security.SSLDisposeContext(self._session_context)
@@ -1334,9 +1471,10 @@ class TLSSocket(object):
                 except (socket_.error):
                     pass
                 self._socket = None
+            self._select_sockets = None
 
-            if self._connection_id in _socket_refs:
-                del _socket_refs[self._connection_id]
+            if self._connection_id in _connection_refs:
+                del _connection_refs[self._connection_id]
 
     def _read_certificates(self):
         """
@@ -1360,27 +1498,30 @@ class TLSSocket(object):
 
             number_certs = Security.SecTrustGetCertificateCount(trust_ref)
 
-            self._intermediates = []
+            intermediates_der = [None] * max(0, number_certs - 1)
+
+            get_certificate_at_index = Security.SecTrustGetCertificateAtIndex
+            copy_data = Security.SecCertificateCopyData
+            cf_data_to_bytes = CFHelpers.cf_data_to_bytes
+            cf_release = CoreFoundation.CFRelease
 
             for index in range(0, number_certs):
-                sec_certificate_ref = Security.SecTrustGetCertificateAtIndex(
-                    trust_ref,
-                    index
-                )
-                cf_data_ref = Security.SecCertificateCopyData(sec_certificate_ref)
+                sec_certificate_ref = get_certificate_at_index(trust_ref, index)
+                cf_data_ref = copy_data(sec_certificate_ref)
 
-                cert_data = CFHelpers.cf_data_to_bytes(cf_data_ref)
+                cert_data = cf_data_to_bytes(cf_data_ref)
 
-                result = CoreFoundation.CFRelease(cf_data_ref)
+                result = cf_release(cf_data_ref)
                 handle_cf_error(result)
                 cf_data_ref = None
 
-                cert = Asn1Certificate.load(cert_data)
-
                 if index == 0:
-                    self._certificate = cert
+                    self._certificate = Asn1Certificate.load(cert_data)
                 else:
-                    self._intermediates.append(cert)
+                    intermediates_der[index - 1] = cert_data
+
+            self._intermediates = None
+            self._intermediates_der = intermediates_der
 
         finally:
             if trust_ref:
@@ -1431,6 +1572,10 @@ class TLSSocket(object):
         if self._certificate is None:
             self._read_certificates()
 
+        if self._intermediates is None:
+            self._intermediates = [Asn1Certificate.load(cert_data) for cert_data in self._intermediates_der]
+            self._intermediates_der = None
+
         return self._intermediates
 
     @property
@@ -1510,4 +1655,7 @@ class TLSSocket(object):
         return self._socket
 
     def __del__(self):
+        # Sockets that were already closed have nothing left to release
+        if self._session_context is None and self._socket is None:
+            return
         self.close()
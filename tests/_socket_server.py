@@ -4,6 +4,7 @@ from __future__ import unicode_literals, division, absolute_import, print_functi
 
 import socket
 import select
+import ssl
 import threading
 
 
@@ -39,3 +40,36 @@ def make_socket_server(port, on_read=None):
     )
     t.start()
     return server
+
+
+def tls_listen(server, cert_path, key_path, on_connect):
+    sock, addr = server.accept()
+
+    try:
+        if hasattr(ssl, 'SSLContext'):
+            context = ssl.SSLContext(getattr(ssl, 'PROTOCOL_TLS_SERVER', ssl.PROTOCOL_SSLv23))
+            context.load_cert_chain(cert_path, key_path)
+            sock = context.wrap_socket(sock, server_side=True)
+        else:
+            sock = ssl.wrap_socket(sock, key_path, cert_path, server_side=True)
+        on_connect(sock)
+    except (socket.error, select.error, ssl.SSLError, OSError, ValueError):
+        pass
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except (socket.error, OSError, ValueError):
+        pass
+    sock.close()
+
+
+def make_tls_socket_server(port, cert_path, key_path, on_connect):
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind(('', port))
+    server.listen(1)
+    t = threading.Thread(
+        target=tls_listen,
+        args=(server, cert_path, key_path, on_connect)
+    )
+    t.start()
+    return server
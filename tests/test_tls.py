@@ -19,7 +19,7 @@ from .exception_context import assert_exception
 from ._unittest_compat import patch
 from ._https_client import HttpsClient
 from ._socket_proxy import make_socket_proxy
-from ._socket_server import make_socket_server
+from ._socket_server import make_socket_server, make_tls_socket_server
 
 if sys.version_info < (3,):
     import thread
@@ -45,6 +45,8 @@ fixtures_dir = os.path.join(tests_root, 'fixtures')
 
 digicert_ca_path = os.path.join(fixtures_dir, 'digicert_ca.crt')
 badtls_ca_path = os.path.join(fixtures_dir, 'badtls.io_ca.crt')
+server_chain_path = os.path.join(fixtures_dir, 'keys', 'test-third-chain.crt')
+server_key_path = os.path.join(fixtures_dir, 'keys', 'test-third.key')
 
 # PyPy <= 5.6.0 on OS X 10.11 has a bug with _get_clocktime
 osx_pypy_bug = platform.python_implementation() == 'PyPy' \
@@ -142,6 +144,79 @@ class TLSTests(unittest.TestCase):
                 s.close()
             socket.setdefaulttimeout(def_timeout)
 
+    @connection_timeout()
+    def test_tls_write_partial_send(self):
+        data = b'x' * (4 * 1024 * 1024)
+        received = []
+
+        def on_connect(sock):
+            # Don't read until the client has filled the socket buffers
+            time.sleep(1)
+            length = 0
+            while length < len(data):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                length += len(chunk)
+            received.append(length)
+            sock.send(b'done\n')
+
+        s = None
+        try:
+            s = make_tls_socket_server(8443, server_chain_path, server_key_path, on_connect)
+            session = tls.TLSSession(manual_validation=True)
+            tsock = tls.TLSSocket('localhost', 8443, timeout=5, session=session)
+            tsock.write(data)
+            self.assertEqual(b'done\n', tsock.read_line())
+            self.assertEqual([len(data)], received)
+            tsock.close()
+        finally:
+            if s:
+                s.close()
+
+    @connection_timeout()
+    def test_tls_read_until_split_marker(self):
+        def on_connect(sock):
+            # Each send() is its own TLS record, so the client reads the
+            # first half of the marker before the second half arrives
+            sock.send(b'first line\r')
+            time.sleep(0.5)
+            sock.send(b'\nsecond')
+            sock.recv(8192)
+
+        s = None
+        try:
+            s = make_tls_socket_server(8443, server_chain_path, server_key_path, on_connect)
+            session = tls.TLSSession(manual_validation=True)
+            tsock = tls.TLSSocket('localhost', 8443, session=session)
+            self.assertEqual(b'first line\r\n', tsock.read_until(b'\r\n'))
+            self.assertEqual(b'second', tsock.read(6))
+            tsock.close()
+        finally:
+            if s:
+                s.close()
+
+    @connection_timeout()
+    def test_tls_certificate_before_intermediates(self):
+        s = None
+        try:
+            s = make_tls_socket_server(8443, server_chain_path, server_key_path, lambda sock: sock.recv(8192))
+            session = tls.TLSSession(manual_validation=True)
+            tsock = tls.TLSSocket('localhost', 8443, session=session)
+            cert = tsock.certificate
+            self.assertIsInstance(cert, x509.Certificate)
+            self.assertEqual('Test Third-Level Certificate', cert.subject.native['organizational_unit_name'])
+            intermediates = tsock.intermediates
+            self.assertEqual(2, len(intermediates))
+            for intermediate in intermediates:
+                self.assertIsInstance(intermediate, x509.Certificate)
+            self.assertEqual('Testing Intermediate', intermediates[0].subject.native['organizational_unit_name'])
+            self.assertEqual(True, intermediates is tsock.intermediates)
+            tsock.close()
+        finally:
+            if s:
+                s.close()
+
     @connection_timeout()
     def test_tls_error_missing_issuer(self):
         expected = 'certificate issuer not found in trusted root certificate store'